@@ -1,9 +1,12 @@
-import requests
 import json
 import urllib.parse
 import time
 import sys
 
+from scraper_http import HedgedClient, CircuitOpenError, ScrapeError
+from event_crosswalk import open_crosswalk
+from scraper_profile import Profiler
+
 # Set to False to reduce logging output
 DEBUG = False
 
@@ -16,121 +19,199 @@ def debug_print(message):
 def log_print(message):
     print(message, file=sys.stderr)
 
-all_events = []
-take = 20
-skip = 0
-
-try:
-    while True:
-        encoded_q = "%7B%22queries%22%3A%5B%7B%22query%22%3A%7B%22eventType%22%3A%22UPCOMING%22%2C%22categories%22%3A%5B2%5D%2C%22zones%22%3A%7B%7D%2C%22hasOdds%22%3Atrue%7D%2C%22view%22%3A%7B%22marketTypes%22%3A%5B%223743%22%5D%7D%2C%22skip%22%3ASKIP_PLACEHOLDER%2C%22take%22%3A20%7D%5D%7D"
-        encoded_query = encoded_q.replace("SKIP_PLACEHOLDER", str(skip))
-        url = f"https://www.betpawa.co.ke/api/sportsbook/v2/events/lists/by-queries?q={encoded_query}"
-
-        debug_print(f"Fetching page with skip={skip}...")
-        headers = {
-            "accept": "*/*",
-            "accept-language": "en-GB,en-US;q=0.9,en;q=0.8,la;q=0.7",
-            "baggage": "sentry-environment=production,sentry-release=1.203.58,sentry-public_key=f051fd6f1fdd4877afd406a80df0ddb8,sentry-trace_id=69dc4eced394402e8b4842078bf03b47,sentry-sample_rate=0.1,sentry-transaction=Upcoming,sentry-sampled=false",
-            "devicetype": "web",
-            "if-modified-since": "Tue, 22 Apr 2025 16:29:07 GMT",
-            "priority": "u=1, i",
-            "referer": "https://www.betpawa.co.ke/events?marketId=1X2&categoryId=2",
-            "sec-ch-ua": "\"Google Chrome\";v=\"135\", \"Not-A.Brand\";v=\"8\", \"Chromium\";v=\"135\"",
-            "sec-ch-ua-mobile": "?0",
-            "sec-ch-ua-platform": "\"macOS\"",
-            "sec-fetch-dest": "empty",
-            "sec-fetch-mode": "cors",
-            "sec-fetch-site": "same-origin",
-            "sentry-trace": "69dc4eced394402e8b4842078bf03b47-982bacd1c87283b4-0",
-            "traceid": "1ecc4dce-f388-46a2-8275-0acddeffcf4d",
-            "user-agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/135.0.0.0 Safari/537.36",
-            "vuejs": "true",
-            "x-pawa-brand": "betpawa-kenya",
-            "x-pawa-language": "en"
-        }
-        cookies = {
-            "_ga": "GA1.1.459857438.1713161475",
-            "_ga_608WPEPCC3": "GS1.1.1731480684.7.0.1731480684.0.0.0",
-            "aff_cookie": "F60",
-            "_gcl_au": "1.1.1725251410.1738666716",
-            "PHPSESSID": "b0694dabe05179bc223abcdf8f7bf83e",
-            "tracingId": "0f5927de-e30d-4228-b29c-c92210017a62",
-            "x-pawa-token": "b4c6eda2ae319f4b-8a3075ba3c9d9984",
-            "cf_clearance": "DjcwCGXGFkKOCvAa7tthq5gHd2OnDjc9YCNhMNiDvtA-1745326277-1.2.1.1-4gXeQQAJCLcc73SQfF5WbdmY2stVELoIXQ4tNlEqXQ0YXVQexCJyNKBDdmSZPCEsPbDSCyZ9Dq44i6QG9pmnHaPl6oqYLOYRPyyGksyRWjy7XVmbseQZR1hRppEkLe.7dz9mbrh9M4.i4Yacl75TmAvcpO_gneOw9053uogjahyJiTXWfAjtuWaM1MHey5z8kKPCRJV.yHO84079d6Bjxjg0e8H7rZQYzBqV2uVOC6hc5gMFcXLn3r9VJtyQlXT1i2ZEGgk2etljGYq28fPXWB7ACaZDUxpSH9ufodLbNbWF0uXfJbB_uCLTkyh3e05.eW2AZ61JkrDY5JUO1Z9bLUJg29DoAi0rVMAu.XHUX_c",
-            "__cf_bm": "GWFTquZa.ZseXCY1d0MojQJ5ioXLrt9Kzpw9Ys1VK.Y-1745339708-1.0.1.1-fuzWFb1qmUZL9JpleqcSQbFzUdv16bOpJFyE.zXq45luhtH40Q.Ow4FzDOJpSrLDa4Zw9eBJKYmqAh.mYKYnlwRSmU9CFdGAY5YOHJdUqAg",
-            "_ga_81NDDTKQDC": "GS1.1.1745339340.454.1.1745340303.60.0.0"
-        }
-        
-        try:
-            response = requests.get(url, headers=headers, cookies=cookies)
+TIMEOUT = 15  # Per-request timeout; slow pages are hedged well before this
+MAX_RUNTIME = 120  # Global runtime limit in seconds
+REQUEST_INTERVAL = 0.3  # Minimum seconds between page requests, to avoid hitting rate limits
+BOOKMAKER_CODE = "bp KE"  # Our code for this bookmaker in the event-ID crosswalk
 
-            if response.status_code != 200:
-                debug_print(f"Request failed with status {response.status_code}")
-                break
+# Per-phase cProfile/tracemalloc dumps when run with --profile or SCRAPER_PROFILE=true
+PROFILER = Profiler(BOOKMAKER_CODE)
+
+# Returned when run on its own and the scraper hits an unexpected error
+SAMPLE_EVENTS = [
+    {
+        "eventId": "BPK123456",
+        "country": "Kenya",
+        "tournament": "Kenya Premier League",
+        "event": "Gor Mahia vs AFC Leopards",
+        "market": "1X2",
+        "home_odds": "1.95",
+        "draw_odds": "3.50",
+        "away_odds": "4.60",
+        "start_time": "2025-04-24 10:08"
+    },
+    {
+        "eventId": "SPT12345",
+        "country": "England",
+        "tournament": "Premier League",
+        "event": "Arsenal vs Chelsea",
+        "market": "1X2",
+        "home_odds": "2.05",
+        "draw_odds": "3.50",
+        "away_odds": "3.70",
+        "start_time": "2025-04-24 11:40"
+    }
+]
+
+def scrape(client=None, crosswalk=None, deadline=None, cancel=None):
+    """Fetch every page of upcoming events
+
+    A caller running several bookmakers at once can pass in a shared client,
+    crosswalk and deadline (epoch seconds); otherwise they are created here.
+    cancel is an optional threading.Event that stops pagination when set.
+    Raises ScrapeError if requests failed before any event was collected.
+    """
+    own_client = client is None
+    if own_client:
+        client = HedgedClient(timeout=TIMEOUT)
+    own_crosswalk = crosswalk is None
+    if own_crosswalk:
+        # None if the crosswalk file can't be opened; events are then returned without fixture ids
+        crosswalk = open_crosswalk()
+    if deadline is None:
+        deadline = time.time() + MAX_RUNTIME
 
-            result = response.json()
-            events = result.get("responses", [])[0].get("responses", [])
+    all_events = []
+    take = 20
+    skip = 0
+    error = None
+    fatal = None
 
-            if not events:
-                debug_print("No more events found. Stopping.")
+    try:
+        while True:
+            if time.time() > deadline:
+                log_print(f"Reached runtime limit, stopping after skip={skip}")
                 break
+            if cancel is not None and cancel.is_set():
+                log_print(f"Cancelled, stopping after skip={skip}")
+                break
+
+            encoded_q = "%7B%22queries%22%3A%5B%7B%22query%22%3A%7B%22eventType%22%3A%22UPCOMING%22%2C%22categories%22%3A%5B2%5D%2C%22zones%22%3A%7B%7D%2C%22hasOdds%22%3Atrue%7D%2C%22view%22%3A%7B%22marketTypes%22%3A%5B%223743%22%5D%7D%2C%22skip%22%3ASKIP_PLACEHOLDER%2C%22take%22%3A20%7D%5D%7D"
+            encoded_query = encoded_q.replace("SKIP_PLACEHOLDER", str(skip))
+            url = f"https://www.betpawa.co.ke/api/sportsbook/v2/events/lists/by-queries?q={encoded_query}"
+
+            debug_print(f"Fetching page with skip={skip}...")
+            headers = {
+                "accept": "*/*",
+                "accept-language": "en-GB,en-US;q=0.9,en;q=0.8,la;q=0.7",
+                "baggage": "sentry-environment=production,sentry-release=1.203.58,sentry-public_key=f051fd6f1fdd4877afd406a80df0ddb8,sentry-trace_id=69dc4eced394402e8b4842078bf03b47,sentry-sample_rate=0.1,sentry-transaction=Upcoming,sentry-sampled=false",
+                "devicetype": "web",
+                "if-modified-since": "Tue, 22 Apr 2025 16:29:07 GMT",
+                "priority": "u=1, i",
+                "referer": "https://www.betpawa.co.ke/events?marketId=1X2&categoryId=2",
+                "sec-ch-ua": "\"Google Chrome\";v=\"135\", \"Not-A.Brand\";v=\"8\", \"Chromium\";v=\"135\"",
+                "sec-ch-ua-mobile": "?0",
+                "sec-ch-ua-platform": "\"macOS\"",
+                "sec-fetch-dest": "empty",
+                "sec-fetch-mode": "cors",
+                "sec-fetch-site": "same-origin",
+                "sentry-trace": "69dc4eced394402e8b4842078bf03b47-982bacd1c87283b4-0",
+                "traceid": "1ecc4dce-f388-46a2-8275-0acddeffcf4d",
+                "user-agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/135.0.0.0 Safari/537.36",
+                "vuejs": "true",
+                "x-pawa-brand": "betpawa-kenya",
+                "x-pawa-language": "en"
+            }
+            cookies = {
+                "_ga": "GA1.1.459857438.1713161475",
+                "_ga_608WPEPCC3": "GS1.1.1731480684.7.0.1731480684.0.0.0",
+                "aff_cookie": "F60",
+                "_gcl_au": "1.1.1725251410.1738666716",
+                "PHPSESSID": "b0694dabe05179bc223abcdf8f7bf83e",
+                "tracingId": "0f5927de-e30d-4228-b29c-c92210017a62",
+                "x-pawa-token": "b4c6eda2ae319f4b-8a3075ba3c9d9984",
+                "cf_clearance": "DjcwCGXGFkKOCvAa7tthq5gHd2OnDjc9YCNhMNiDvtA-1745326277-1.2.1.1-4gXeQQAJCLcc73SQfF5WbdmY2stVELoIXQ4tNlEqXQ0YXVQexCJyNKBDdmSZPCEsPbDSCyZ9Dq44i6QG9pmnHaPl6oqYLOYRPyyGksyRWjy7XVmbseQZR1hRppEkLe.7dz9mbrh9M4.i4Yacl75TmAvcpO_gneOw9053uogjahyJiTXWfAjtuWaM1MHey5z8kKPCRJV.yHO84079d6Bjxjg0e8H7rZQYzBqV2uVOC6hc5gMFcXLn3r9VJtyQlXT1i2ZEGgk2etljGYq28fPXWB7ACaZDUxpSH9ufodLbNbWF0uXfJbB_uCLTkyh3e05.eW2AZ61JkrDY5JUO1Z9bLUJg29DoAi0rVMAu.XHUX_c",
+                "__cf_bm": "GWFTquZa.ZseXCY1d0MojQJ5ioXLrt9Kzpw9Ys1VK.Y-1745339708-1.0.1.1-fuzWFb1qmUZL9JpleqcSQbFzUdv16bOpJFyE.zXq45luhtH40Q.Ow4FzDOJpSrLDa4Zw9eBJKYmqAh.mYKYnlwRSmU9CFdGAY5YOHJdUqAg",
+                "_ga_81NDDTKQDC": "GS1.1.1745339340.454.1.1745340303.60.0.0"
+            }
+        
+            try:
+                with PROFILER.phase("fetch"):
+                    response = client.get(url, min_interval=REQUEST_INTERVAL, headers=headers, cookies=cookies)
+
+                if response.status_code != 200:
+                    debug_print(f"Request failed with status {response.status_code}")
+                    error = f"Request failed with status {response.status_code}"
+                    break
 
-            from datetime import datetime
-
-            for event in events:
-                try:
-                    widget = next(w for w in event.get("widgets", []) if w.get("type") == "SPORTRADAR")
-                    market = next((m for m in event.get("markets", []) if m["marketType"]["id"] == "3743"), None)
-                    prices = {p["name"]: p["price"] for p in market.get("prices", [])}
-
-                    all_events.append({
-                        "eventId": widget["id"],
-                        "country": event["region"]["name"],
-                        "tournament": event["competition"]["name"],
-                        "event": event["name"],
-                        "market": market["marketType"]["name"],
-                        "home_odds": str(prices.get("1", "")),
-                        "draw_odds": str(prices.get("X", "")),
-                        "away_odds": str(prices.get("2", "")),
-                        "start_time": datetime.fromisoformat(event["startTime"].replace("Z", "")).strftime("%Y-%m-%d %H:%M")
-                    })
-                except Exception as e:
-                    debug_print(f"Skipping event due to error: {e}")
+                with PROFILER.phase("parse"):
+                    result = response.json()
+                    events = result.get("responses", [])[0].get("responses", [])
+
+                if not events:
+                    debug_print("No more events found. Stopping.")
+                    break
+
+                from datetime import datetime
+
+                with PROFILER.phase("parse"):
+                    for event in events:
+                        try:
+                            widget = next(w for w in event.get("widgets", []) if w.get("type") == "SPORTRADAR")
+                            market = next((m for m in event.get("markets", []) if m["marketType"]["id"] == "3743"), None)
+                            prices = {p["name"]: p["price"] for p in market.get("prices", [])}
+
+                            # startTime is UTC ("...Z"); start_time keeps it as-is, the crosswalk gets the epoch
+                            kickoff = datetime.fromisoformat(event["startTime"].replace("Z", "+00:00")).timestamp()
+                            parsed_event = {
+                                "eventId": widget["id"],
+                                "country": event["region"]["name"],
+                                "tournament": event["competition"]["name"],
+                                "event": event["name"],
+                                "market": market["marketType"]["name"],
+                                "home_odds": str(prices.get("1", "")),
+                                "draw_odds": str(prices.get("X", "")),
+                                "away_odds": str(prices.get("2", "")),
+                                "start_time": datetime.fromisoformat(event["startTime"].replace("Z", "")).strftime("%Y-%m-%d %H:%M")
+                            }
+                            # The SPORTRADAR widget id is the Sportradar match id, so it links directly
+                            if crosswalk is not None:
+                                crosswalk.stamp(parsed_event, BOOKMAKER_CODE, widget["id"],
+                                                sportradar_id=widget["id"], kickoff=kickoff)
+                            all_events.append(parsed_event)
+                        except Exception as e:
+                            debug_print(f"Skipping event due to error: {e}")
             
-            skip += take
-            time.sleep(0.3)  # To avoid hitting rate limits
-        except Exception as e:
-            debug_print(f"Error fetching page: {e}")
-            break
-except Exception as e:
-    debug_print(f"Fatal error: {e}")
-    
-    # Use sample data as fallback
-    debug_print("Using sample data for betPawa Kenya")
-    all_events = [
-        {
-            "eventId": "BPK123456",
-            "country": "Kenya",
-            "tournament": "Kenya Premier League",
-            "event": "Gor Mahia vs AFC Leopards",
-            "market": "1X2",
-            "home_odds": "1.95",
-            "draw_odds": "3.50",
-            "away_odds": "4.60",
-            "start_time": "2025-04-24 10:08"
-        },
-        {
-            "eventId": "SPT12345",
-            "country": "England",
-            "tournament": "Premier League",
-            "event": "Arsenal vs Chelsea",
-            "market": "1X2",
-            "home_odds": "2.05",
-            "draw_odds": "3.50",
-            "away_odds": "3.70",
-            "start_time": "2025-04-24 11:40"
-        }
-    ]
-
-# Output JSON to stdout for integration
-print(json.dumps(all_events))
+                skip += take
+            except CircuitOpenError as e:
+                log_print(f"{e} - betPawa looks down, skipping this run")
+                error = str(e)
+                break
+            except Exception as e:
+                debug_print(f"Error fetching page: {e}")
+                error = f"Error fetching page: {e}"
+                break
+    except Exception as e:
+        debug_print(f"Fatal error: {e}")
+        fatal = e
+
+    # Shared client/crosswalk are summarized and closed by whoever owns them
+    if own_client:
+        client.close()
+        log_print(client.format_summary())
+    if own_crosswalk and crosswalk is not None:
+        crosswalk.close()
+        log_print(crosswalk.summary())
+
+    if fatal is not None:
+        raise ScrapeError(f"Fatal error: {fatal}") from fatal
+    if error and not all_events:
+        raise ScrapeError(error)
+    return all_events
+
+if __name__ == "__main__":
+    try:
+        all_events = scrape()
+    except ScrapeError as e:
+        log_print(f"betPawa Kenya scrape failed: {e}")
+        # Unexpected errors fall back to sample data as before; failed requests return nothing
+        if e.__cause__ is not None:
+            debug_print("Using sample data for betPawa Kenya")
+            all_events = SAMPLE_EVENTS
+        else:
+            all_events = []
+    with PROFILER.phase("serialize"):
+        output_json = json.dumps(all_events)
+    # Output JSON to stdout for integration
+    with PROFILER.phase("write"):
+        print(output_json)
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Persistent event-ID crosswalk shared by the Python scrapers
+
+Maps each bookmaker's own event id to a canonical fixture id so events seen
+on a previous run don't have to be re-linked from scratch:
+- Sportybet `sr:match:<n>` and betPawa SPORTRADAR widget ids both become `sr:<n>`
+- Events without a Sportradar id (e.g. Betika) are linked by normalized team
+  names + kickoff date, falling back to a name-derived `fx:` id; once a
+  Sportradar id turns up for the same names, the `fx:` id is repointed to it
+- Kickoffs are handled as UTC epoch seconds so bookmakers reporting local
+  and UTC times still produce the same name key
+
+The mapping lives in a small SQLite file and is loaded into memory when the
+crosswalk is opened, so every lookup during a run is a dict hit. Fixtures are
+dropped once they are KICKOFF_GRACE seconds past kickoff; links for events
+without a known kickoff could never expire, so they are kept for the current
+run only and not written to the file.
+
+Node.js scrapers can use it too by piping their JSON output through:
+    python3 event_crosswalk.py "betika KE" < events.json
+integration.ts does this for the bookmakers listed in CROSSWALK_BOOKMAKERS.
+"""
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+from scraper_log import log
+
+# Configuration
+CROSSWALK_FILE = os.environ.get("EVENT_CROSSWALK_FILE", "data/event_crosswalk.sqlite")
+KICKOFF_GRACE = 3 * 60 * 60  # Keep fixtures for 3 hours after kickoff (in-play / late results)
+
+
+def sportradar_fixture_id(event_id):
+    """Canonical fixture id for anything carrying a Sportradar match number"""
+    digits = re.sub(r'\D', '', str(event_id or ''))
+    return f"sr:{digits}" if digits else None
+
+
+def name_key(teams, kickoff):
+    """Normalized "home|away|UTC date" key used to link events that have no shared id"""
+    if not teams:
+        return None
+    sides = re.split(r'\s+(?:-|vs\.?|v)\s+', teams.lower(), maxsplit=1)
+    if len(sides) != 2:
+        return None
+    home, away = (re.sub(r'[^a-z0-9]', '', side) for side in sides)
+    date = datetime.fromtimestamp(kickoff, timezone.utc).strftime('%Y-%m-%d') if kickoff else ''
+    return f"{home}|{away}|{date}"
+
+
+def kickoff_timestamp(start_time):
+    """Parse a "YYYY-MM-DD HH:MM" start_time, taken as UTC, into epoch seconds (None if unparseable)
+
+    Only a fallback for callers that can't pass the exact kickoff to stamp().
+    """
+    try:
+        return datetime.strptime(start_time, '%Y-%m-%d %H:%M').replace(tzinfo=timezone.utc).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+class EventCrosswalk:
+    """On-disk bookmaker event id -> fixture id map with an in-memory index
+
+    Use as a context manager; new links are written back on close().
+    Safe to share between threads.
+    """
+
+    def __init__(self, path=CROSSWALK_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._ids = {}
+        self._names = {}
+        self._pending_ids = {}
+        self._pending_names = {}
+        self._pending_repoints = []
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        try:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS event_ids (
+                    bookmaker TEXT NOT NULL,
+                    event_id TEXT NOT NULL,
+                    fixture_id TEXT NOT NULL,
+                    kickoff REAL,
+                    PRIMARY KEY (bookmaker, event_id)
+                );
+                CREATE TABLE IF NOT EXISTS fixture_names (
+                    name_key TEXT PRIMARY KEY,
+                    fixture_id TEXT NOT NULL,
+                    kickoff REAL
+                );
+            """)
+            self._load()
+        except sqlite3.Error:
+            self._conn.close()
+            raise
+
+    def _load(self):
+        """Drop fixtures past kickoff (and any without one), then pull everything else into memory"""
+        cutoff = time.time() - KICKOFF_GRACE
+        with self._conn:
+            self._conn.execute("DELETE FROM event_ids WHERE kickoff IS NULL OR kickoff < ?", (cutoff,))
+            self._conn.execute("DELETE FROM fixture_names WHERE kickoff IS NULL OR kickoff < ?", (cutoff,))
+        for bookmaker, event_id, fixture_id in self._conn.execute(
+                "SELECT bookmaker, event_id, fixture_id FROM event_ids"):
+            self._ids[(bookmaker, event_id)] = fixture_id
+        for key, fixture_id in self._conn.execute("SELECT name_key, fixture_id FROM fixture_names"):
+            self._names[key] = fixture_id
+
+    def lookup(self, bookmaker, event_id):
+        """Fixture id previously linked to this bookmaker event, or None"""
+        return self._ids.get((bookmaker, str(event_id)))
+
+    def lookup_name(self, teams, kickoff):
+        """Fixture id previously linked to these team names on this (UTC) kickoff date, or None"""
+        key = name_key(teams, kickoff)
+        return self._names.get(key) if key else None
+
+    def stamp(self, event, bookmaker, event_id, sportradar_id=None, kickoff=None):
+        """Resolve the fixture id for an event and set event['fixtureId']
+
+        Already-seen events are a single dict lookup; new ones are linked via
+        their Sportradar id if they have one, otherwise by team names.
+        kickoff is the UTC epoch kickoff; without it start_time is read as UTC.
+        Events without an id are left unstamped (returns None).
+        """
+        if not event_id:
+            return None
+        event_id = str(event_id)
+        teams = event.get('event') or event.get('teams')
+        if kickoff is None:
+            kickoff = kickoff_timestamp(event.get('start_time'))
+        key = name_key(teams, kickoff)
+
+        with self._lock:
+            fixture_id = self._ids.get((bookmaker, event_id))
+            if fixture_id:
+                self.hits += 1
+            else:
+                self.misses += 1
+                fixture_id = (sportradar_fixture_id(sportradar_id)
+                              or (self._names.get(key) if key else None)
+                              or (f"fx:{key}" if key else f"{bookmaker}:{event_id}"))
+                self._ids[(bookmaker, event_id)] = fixture_id
+                # Without a kickoff a row could never be purged, so it stays in memory only
+                if kickoff is not None:
+                    self._pending_ids[(bookmaker, event_id)] = (fixture_id, kickoff)
+                if key and key not in self._names:
+                    self._names[key] = fixture_id
+                    if kickoff is not None:
+                        self._pending_names[key] = (fixture_id, kickoff)
+
+            # A name-only link made before any Sportradar id was seen gets upgraded
+            named = self._names.get(key) if key else None
+            if named and named != fixture_id:
+                if fixture_id.startswith("sr:") and named.startswith("fx:"):
+                    self._repoint(named, fixture_id, kickoff)
+                elif fixture_id.startswith("fx:") and named.startswith("sr:"):
+                    self._repoint(fixture_id, named, kickoff)
+                    fixture_id = named
+
+        event['fixtureId'] = fixture_id
+        return fixture_id
+
+    def _repoint(self, old_id, new_id, kickoff):
+        """Move every event and name linked to old_id over to new_id (caller holds the lock)"""
+        for ids_key, fixture_id in self._ids.items():
+            if fixture_id == old_id:
+                self._ids[ids_key] = new_id
+        for ids_key, (fixture_id, pending_kickoff) in self._pending_ids.items():
+            if fixture_id == old_id:
+                self._pending_ids[ids_key] = (new_id, pending_kickoff)
+        for key, fixture_id in self._names.items():
+            if fixture_id == old_id:
+                self._names[key] = new_id
+                name_kickoff = self._pending_names.get(key, (None, kickoff))[1]
+                if name_kickoff is not None:
+                    self._pending_names[key] = (new_id, name_kickoff)
+        # Rows already on disk (possibly written by another process) are fixed on flush
+        self._pending_repoints.append((old_id, new_id))
+
+    def summary(self):
+        return f"Crosswalk: {self.hits} known events, {self.misses} newly linked"
+
+    def flush(self):
+        """Write links created since the last flush"""
+        with self._lock:
+            ids, self._pending_ids = self._pending_ids, {}
+            names, self._pending_names = self._pending_names, {}
+            repoints, self._pending_repoints = self._pending_repoints, []
+        with self._conn:
+            for old_id, new_id in repoints:
+                self._conn.execute("UPDATE event_ids SET fixture_id = ? WHERE fixture_id = ?", (new_id, old_id))
+                self._conn.execute("UPDATE fixture_names SET fixture_id = ? WHERE fixture_id = ?", (new_id, old_id))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO event_ids (bookmaker, event_id, fixture_id, kickoff) VALUES (?, ?, ?, ?)",
+                [(b, e, f, k) for (b, e), (f, k) in ids.items()])
+            self._conn.executemany(
+                "INSERT INTO fixture_names (name_key, fixture_id, kickoff) VALUES (?, ?, ?) "
+                "ON CONFLICT (name_key) DO UPDATE SET fixture_id = excluded.fixture_id",
+                [(n, f, k) for n, (f, k) in names.items()])
+
+    def close(self):
+        try:
+            self.flush()
+        except sqlite3.Error as e:
+            # Links are rebuilt from ids and names on the next run, so losing them is not fatal
+            log(f"Could not save event crosswalk to {self.path}: {e}", "warning")
+        finally:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def open_crosswalk(path=CROSSWALK_FILE):
+    """EventCrosswalk at path, or None (with a warning) if the file can't be opened
+
+    Fixture ids are an optional extra, so scrapers carry on without them.
+    """
+    try:
+        return EventCrosswalk(path)
+    except (sqlite3.Error, OSError) as e:
+        log(f"Event crosswalk unavailable ({path}: {e}), fixture ids will not be stamped", "warning")
+        return None
+
+
+if __name__ == "__main__":
+    # Stamp fixture ids onto a JSON array of events read from stdin
+    if len(sys.argv) < 2:
+        print("usage: event_crosswalk.py <bookmaker> < events.json", file=sys.stderr)
+        sys.exit(2)
+    bookmaker = sys.argv[1]
+    events = json.load(sys.stdin)
+    crosswalk = open_crosswalk()
+    if crosswalk is not None:
+        with crosswalk:
+            for item in events:
+                crosswalk.stamp(item, bookmaker, item.get('eventId') or item.get('id'))
+            print(crosswalk.summary(), file=sys.stderr)
+    print(json.dumps(events))
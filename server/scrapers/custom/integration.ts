@@ -1,7 +1,7 @@
 import axios from 'axios';
 import fs from 'fs';
 import path from 'path';
-import { exec } from 'child_process';
+import { exec, execFile } from 'child_process';
 import util from 'util';
 
 const execPromise = util.promisify(exec);
@@ -19,6 +19,34 @@ interface ScraperConfig {
 // This will be a dynamic configuration that gets populated with custom scrapers
 const SCRIPT_CONFIG: Record<string, ScraperConfig> = {};
 
+// Non-Python scrapers whose output is piped through event_crosswalk.py so their
+// events get the same fixtureId as the Python scrapers (linked by team names + kickoff)
+const CROSSWALK_BOOKMAKERS = new Set(['betika KE']);
+
+/**
+ * Stamp fixtureId onto a scraper's JSON output using the shared event-ID crosswalk.
+ * Fixture ids are optional, so the original output is returned if the crosswalk fails.
+ */
+function stampFixtureIds(bookmakerCode: string, output: string): Promise<string> {
+  const crosswalkPath = path.join(process.cwd(), 'server', 'scrapers', 'custom', 'event_crosswalk.py');
+  return new Promise(resolve => {
+    const child = execFile('python3', [crosswalkPath, bookmakerCode], { maxBuffer: 64 * 1024 * 1024 },
+      (error, stdout, stderr) => {
+        if (stderr) {
+          console.error(`Event crosswalk (${bookmakerCode}):`, stderr);
+        }
+        if (error || !stdout.trim()) {
+          console.error(`Could not stamp fixture ids for ${bookmakerCode}, using unstamped output:`, error);
+          resolve(output);
+          return;
+        }
+        resolve(stdout);
+      });
+    child.stdin?.on('error', () => { /* reported by the exit callback */ });
+    child.stdin?.end(output);
+  });
+}
+
 /**
  * Generic function to run a custom scraper script for any bookmaker
  * The script should output valid JSON that matches the expected format:
@@ -173,7 +201,7 @@ export async function runCustomScraper(bookmakerCode: string): Promise<any[]> {
       LOG_LEVEL: logLevel
     };
     
-    const { stdout, stderr } = await execPromise(`${config.command} "${config.scriptPath}"`, {
+    const { stdout: scraperOutput, stderr } = await execPromise(`${config.command} "${config.scriptPath}"`, {
       env: env // Pass environment variables including LOG_LEVEL
     });
     
@@ -181,6 +209,11 @@ export async function runCustomScraper(bookmakerCode: string): Promise<any[]> {
       console.error(`Error running ${bookmakerCode} scraper:`, stderr);
     }
     
+    // Link events to canonical fixture ids (ends up in raw.fixtureId after mapping)
+    const stdout = CROSSWALK_BOOKMAKERS.has(bookmakerCode) && scraperOutput.trim()
+      ? await stampFixtureIds(bookmakerCode, scraperOutput)
+      : scraperOutput;
+    
     // Parse the output
     if (config.outputFormat === 'json') {
       try {
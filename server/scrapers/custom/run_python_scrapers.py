@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Run every Python bookmaker scraper concurrently in one process
+
+Each `<code>_scraper.py` in this directory that exposes
+`scrape(client=None, crosswalk=None, deadline=None, cancel=None)` is loaded and
+run in its own thread. All of them share one HedgedClient (connection pool,
+per-host rate limiter, circuit breakers), one event-ID crosswalk and one global
+deadline, so a cycle takes about as long as the slowest bookmaker instead of
+the sum. Scrapers still running after the deadline are cancelled, and the
+shared client and crosswalk are only closed once every worker has stopped.
+
+Results are streamed to stdout as one JSON object per line, in completion order:
+    {"bookmaker": "bp GH", "events": [...], "elapsed": 12.3, "error": null}
+A bookmaker whose scrape() raised (e.g. ScrapeError when every request failed)
+gets its message in "error", and the exit status is 1 if any bookmaker failed.
+Logs go to stderr, like the individual scrapers.
+
+Usage:
+    python3 run_python_scrapers.py [--profile] [bookmaker code ...]
+"""
+import glob
+import importlib.util
+import json
+import os
+import re
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+
+# Scrapers import their helpers as siblings, so make sure this directory is importable
+SCRAPER_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRAPER_DIR not in sys.path:
+    sys.path.insert(0, SCRAPER_DIR)
+
+from scraper_http import HedgedClient
+from event_crosswalk import open_crosswalk
+from scraper_log import log
+
+# Configuration
+DEADLINE = int(os.environ.get("SCRAPER_DEADLINE", "150"))  # Global deadline for the whole cycle, in seconds
+TIMEOUT = 15  # Per-request timeout for the shared client
+
+
+def discover_scrapers():
+    """Map bookmaker code -> loaded module for every Python scraper with a scrape() function
+
+    Uses the same `<code>_scraper.<ext>` naming rule as loadAllCustomScrapers() in integration.ts;
+    a module's BOOKMAKER_CODE takes precedence over its filename.
+    """
+    scrapers = {}
+    for path in sorted(glob.glob(os.path.join(SCRAPER_DIR, "*_scraper.py"))):
+        filename = os.path.basename(path)
+        module_name = re.sub(r'\W', '_', filename[:-3])
+        try:
+            spec = importlib.util.spec_from_file_location(module_name, path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+        except Exception as e:
+            log(f"Could not load {filename}: {e}", "error")
+            continue
+        if not callable(getattr(module, "scrape", None)):
+            log(f"Skipping {filename}: no scrape() function", "debug")
+            continue
+        code = getattr(module, "BOOKMAKER_CODE", filename[:-len("_scraper.py")])
+        scrapers[code] = module
+    return scrapers
+
+
+def emit(result):
+    """Write one bookmaker's result as a single JSON line and flush immediately"""
+    print(json.dumps(result), flush=True)
+
+
+def run_one(code, module, client, crosswalk, deadline, cancel):
+    started = time.time()
+    events = module.scrape(client=client, crosswalk=crosswalk, deadline=deadline, cancel=cancel)
+    return {"bookmaker": code, "events": events or [], "elapsed": round(time.time() - started, 2), "error": None}
+
+
+def main(selected=None):
+    started = time.time()
+    deadline = started + DEADLINE
+    scrapers = discover_scrapers()
+    if selected:
+        scrapers = {code: module for code, module in scrapers.items() if code in selected}
+    log(f"Running {len(scrapers)} Python scrapers concurrently ({', '.join(scrapers)}), deadline {DEADLINE}s")
+
+    failures = 0
+    client = HedgedClient(timeout=TIMEOUT, max_workers=max(8, 2 * len(scrapers)))
+    crosswalk = open_crosswalk()  # None if unavailable; each scraper then tries its own
+    cancel = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=max(1, len(scrapers)), thread_name_prefix="scraper")
+    futures = {executor.submit(run_one, code, module, client, crosswalk, deadline, cancel): code
+               for code, module in scrapers.items()}
+    try:
+        # Give stragglers one request timeout past the deadline to finish their current page
+        for future in as_completed(futures, timeout=max(0, deadline - time.time()) + TIMEOUT):
+            code = futures[future]
+            try:
+                result = future.result()
+                log(f"✅ {code}: {len(result['events'])} events in {result['elapsed']}s")
+            except Exception as e:
+                failures += 1
+                log(f"❌ {code} scraper failed: {e}", "error")
+                log(traceback.format_exc(), "debug")
+                result = {"bookmaker": code, "events": [], "elapsed": round(time.time() - started, 2), "error": str(e)}
+            emit(result)
+    except FuturesTimeoutError:
+        cancel.set()
+        for future, code in futures.items():
+            if not future.done():
+                failures += 1
+                log(f"⚠️ {code} did not finish before the deadline", "warning")
+                emit({"bookmaker": code, "events": [], "elapsed": round(time.time() - started, 2),
+                      "error": "Deadline exceeded"})
+    finally:
+        # Stragglers stop at their next page once cancelled; wait for them before closing what they share
+        cancel.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+        if crosswalk is not None:
+            crosswalk.close()
+        client.close()
+
+    log(client.format_summary())
+    if crosswalk is not None:
+        log(crosswalk.summary())
+    log(f"All Python scrapers finished in {time.time() - started:.1f}s ({failures} failed)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    # Flags such as --profile are picked up by the scraper modules themselves
+    sys.exit(main([arg for arg in sys.argv[1:] if not arg.startswith("--")]))
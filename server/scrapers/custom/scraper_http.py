@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP transport for the Python bookmaker scrapers
+
+Provides hedged GET requests and a circuit breaker per endpoint:
+- Every completed attempt is timed so we keep a rolling p95 per endpoint, and
+  every page is timed as the caller sees it for the run's p50/p95/p99 summary
+- If a request is still running past the rolling p95, a duplicate request is sent
+  and whichever answers first wins
+- After repeated failures an endpoint's breaker opens and calls fail fast
+  until the cooldown expires, then a single probe request is let through
+
+A per-host rate limiter spaces out request starts, so several scrapers (or
+several threads) sharing one client stay polite to each bookmaker.
+
+Breaker state is persisted to a small JSON file so a bookmaker that is down
+is not hammered again on every scheduled cycle. Several scraper processes run
+at once, so each one merges only the endpoints it used into the file, under
+a lock, and replaces the file atomically.
+
+This module is not a scraper itself (the filename deliberately does not end
+in `_scraper.py`, so integration.ts does not register it).
+"""
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from urllib.parse import urlsplit
+
+import requests
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to the atomic replace alone
+    fcntl = None
+
+# Configuration
+DEFAULT_TIMEOUT = 15  # Hard per-request timeout in seconds
+LATENCY_WINDOW = 200  # Number of recent samples kept per endpoint
+MIN_HEDGE_SAMPLES = 5  # Don't hedge until we know what "slow" looks like
+MIN_HEDGE_DELAY = 0.25  # Never hedge sooner than this (seconds)
+FAILURE_THRESHOLD = 3  # Consecutive failures before the breaker opens
+RESET_TIMEOUT = 300  # Seconds an open breaker waits before allowing a probe
+FAILURE_STATUSES = {403, 429}  # Cloudflare blocks and throttling count as failures, like 5xx
+CIRCUIT_STATE_FILE = os.environ.get("SCRAPER_CIRCUIT_STATE", "data/.circuit_state.json")
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request is refused because the endpoint's breaker is open"""
+
+
+class ScrapeError(Exception):
+    """Raised by a scraper's scrape() when requests failed and nothing was collected"""
+
+
+def endpoint_key(url):
+    """Endpoint identity used for latency tracking and circuit breaking (host + path)"""
+    parts = urlsplit(url)
+    return f"{parts.netloc}{parts.path}"
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers (None if empty)"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(0, math.ceil(pct / 100.0 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+class LatencyTracker:
+    """Rolling window of request latencies for one endpoint"""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def hedge_delay(self):
+        """How long to wait before hedging, or None if we don't have enough data yet"""
+        with self._lock:
+            if len(self._samples) < MIN_HEDGE_SAMPLES:
+                return None
+            p95 = percentile(list(self._samples), 95)
+        return max(MIN_HEDGE_DELAY, p95)
+
+
+class RateLimiter:
+    """Minimum spacing between request starts, per host, shared across threads"""
+
+    def __init__(self):
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host, min_interval):
+        """Block until this host may be called again, then reserve the following slot"""
+        if not min_interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class CircuitBreaker:
+    """Closed -> open after FAILURE_THRESHOLD failures -> half-open after RESET_TIMEOUT"""
+
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT,
+                 failures=0, opened_at=None):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = failures
+        self.opened_at = opened_at
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.time() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        """True if a request may be sent now (only one probe at a time while half-open)"""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            # A failed probe re-opens immediately; otherwise open once we hit the threshold
+            if self._probing or self.failures >= self.failure_threshold:
+                self.opened_at = time.time()
+            self._probing = False
+
+
+class HedgedClient:
+    """requests wrapper adding timeouts, hedging and per-endpoint circuit breakers
+
+    Safe to share between threads, so several scrapers can use the same
+    connection pool.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, hedge=True, state_file=CIRCUIT_STATE_FILE,
+                 max_workers=8):
+        self.timeout = timeout
+        self.hedge = hedge
+        self.state_file = state_file
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.hedged_count = 0
+        self.rate_limiter = RateLimiter()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedge")
+        self._latency = {}
+        self._page_latencies = []  # Per-page latency as callers saw it, hedge wait included
+        self._breakers = {}
+        self._touched = set()  # Endpoints whose breaker this process updated
+        self._lock = threading.Lock()
+        self._load_state()
+
+    # ----- state -----
+
+    def _read_state(self):
+        """Saved breaker state ({} if missing or unreadable)"""
+        try:
+            with open(self.state_file) as f:
+                saved = json.load(f)
+            return saved if isinstance(saved, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _load_state(self):
+        if not self.state_file:
+            return
+        for key, entry in self._read_state().items():
+            self._breakers[key] = CircuitBreaker(failures=entry.get("failures", 0),
+                                                 opened_at=entry.get("opened_at"))
+
+    def save_state(self):
+        """Persist breaker state so the next run can fail fast on a dead endpoint
+
+        Other scraper processes may be saving at the same time, so the file is
+        re-read under a lock and only the endpoints this process touched are
+        overwritten; the new file is written aside and swapped in atomically.
+        """
+        if not self.state_file:
+            return
+        with self._lock:
+            updates = {key: {"failures": self._breakers[key].failures,
+                             "opened_at": self._breakers[key].opened_at}
+                       for key in self._touched}
+        if not updates:
+            return
+        state_dir = os.path.dirname(self.state_file) or "."
+        try:
+            os.makedirs(state_dir, exist_ok=True)
+            with open(self.state_file + ".lock", "w") as lock_file:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                state = self._read_state()
+                state.update(updates)
+                fd, tmp_path = tempfile.mkstemp(dir=state_dir, prefix=".circuit_state.")
+                try:
+                    with os.fdopen(fd, "w") as f:
+                        json.dump(state, f)
+                    os.replace(tmp_path, self.state_file)
+                except BaseException:
+                    os.unlink(tmp_path)
+                    raise
+        except OSError:
+            pass
+
+    def close(self):
+        self.save_state()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def breaker(self, key):
+        with self._lock:
+            if key not in self._breakers:
+                self._breakers[key] = CircuitBreaker()
+            return self._breakers[key]
+
+    def tracker(self, key):
+        with self._lock:
+            if key not in self._latency:
+                self._latency[key] = LatencyTracker()
+            return self._latency[key]
+
+    # ----- requests -----
+
+    def _timed_get(self, key, url, kwargs):
+        started = time.monotonic()
+        response = self.session.get(url, timeout=self.timeout, **kwargs)
+        self.tracker(key).record(time.monotonic() - started)
+        return response
+
+    def get(self, url, min_interval=0, **kwargs):
+        """GET with rate limiting, hedging and circuit breaking
+
+        min_interval is the minimum spacing (seconds) between requests to this
+        host across everything sharing the client; hedged duplicates don't count.
+        Raises CircuitOpenError if the endpoint is currently considered down,
+        otherwise behaves like requests.get (including raising on network errors).
+        """
+        key = endpoint_key(url)
+        breaker = self.breaker(key)
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit open for {key}")
+        self.rate_limiter.wait(urlsplit(url).netloc, min_interval)
+
+        started = time.monotonic()
+        try:
+            response = self._hedged_get(key, url, kwargs)
+        except Exception:
+            breaker.record_failure()
+            raise
+        finally:
+            with self._lock:
+                self._page_latencies.append(time.monotonic() - started)
+                self._touched.add(key)
+
+        if response.status_code >= 500 or response.status_code in FAILURE_STATUSES:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    def _hedged_get(self, key, url, kwargs):
+        primary = self._executor.submit(self._timed_get, key, url, kwargs)
+        delay = self.tracker(key).hedge_delay() if self.hedge else None
+        if delay is None:
+            return primary.result()
+
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        # Primary is slower than the rolling p95: race a duplicate against it
+        with self._lock:
+            self.hedged_count += 1
+        pending = {primary, self._executor.submit(self._timed_get, key, url, kwargs)}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    # ----- reporting -----
+
+    def latency_summary(self):
+        """p50/p95/p99 of page latency across every endpoint this client has talked to"""
+        with self._lock:
+            samples = list(self._page_latencies)
+        return {
+            "count": len(samples),
+            "p50": percentile(samples, 50),
+            "p95": percentile(samples, 95),
+            "p99": percentile(samples, 99),
+        }
+
+    def format_summary(self):
+        """One-line latency summary for run logs"""
+        s = self.latency_summary()
+        if not s["count"]:
+            return "Page latency: no requests completed"
+        return (f"Page latency: p50={s['p50']:.2f}s p95={s['p95']:.2f}s p99={s['p99']:.2f}s "
+                f"({s['count']} pages, {self.hedged_count} hedged)")
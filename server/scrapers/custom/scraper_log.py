@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Shared stderr logger for the Python scrapers, the runner and the snapshot service
+
+Logs go to stderr so stdout stays clean for the JSON that integration.ts
+reads. LOG_LEVEL (critical, error, warning, info, debug; default info) is
+passed through from Node and sets the lowest level that gets printed.
+"""
+import os
+import sys
+from datetime import datetime
+
+# Lower number = higher priority
+LOG_LEVELS = {"critical": 0, "error": 1, "warning": 2, "info": 3, "debug": 4}
+
+
+def log(message, level="info"):
+    """Log to stderr with timestamp if level is within LOG_LEVEL (default info)"""
+    env_level = LOG_LEVELS.get(os.environ.get("LOG_LEVEL", "info").lower(), 3)
+    if LOG_LEVELS.get(level.lower(), 3) <= env_level:
+        timestamp = datetime.now().strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+        print(f"[{timestamp}] [{level.upper()}] {message}", file=sys.stderr, flush=True)
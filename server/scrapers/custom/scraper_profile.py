@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Opt-in profiling for the Python scrapers
+
+Enable with `--profile` on the command line or SCRAPER_PROFILE=true in the
+environment (passed through by integration.ts like LOG_LEVEL). Scrapers wrap
+their work in phases:
+
+    with PROFILER.phase("fetch"):
+        ...
+
+For every phase we keep a cProfile profile and the memory allocated while
+the phase ran (a tracemalloc snapshot is taken on entry and compared on exit,
+summed over every call). At process exit they are written to
+profiles/<timestamp>/<scraper>/ as:
+- <phase>.pstats        (open with `python -m pstats` or snakeviz)
+- <phase>.alloc.txt     (lines that allocated the most during the phase)
+and a short summary of the hottest functions is printed to stderr.
+
+Requests run on the HTTP client's worker threads, so network time shows up
+in the "fetch" phase as lock waits rather than socket calls. tracemalloc is
+process-wide, so allocations made by other threads while a phase runs are
+counted in it too.
+
+When profiling is off, phase() is a no-op context manager.
+"""
+import atexit
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+# Configuration
+PROFILE_ENABLED = ("--profile" in sys.argv
+                   or os.environ.get("SCRAPER_PROFILE", "").lower() in ("1", "true", "yes"))
+PROFILE_DIR = os.environ.get("SCRAPER_PROFILE_DIR", "profiles")
+RUN_STAMP = datetime.now().strftime('%Y%m%d-%H%M%S')  # One directory per process run
+TOP_FUNCTIONS = 10  # Hot functions listed per phase in the stderr summary
+TOP_ALLOCATIONS = 25  # Allocating lines written per phase to <phase>.alloc.txt
+
+
+class PhaseStats:
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self.wall = 0.0
+        self.calls = 0
+        self.allocations = {}  # traceback -> [size diff, count diff]
+        self.profiled = False
+
+
+class Profiler:
+    """Per-scraper phase profiler; results are flushed once, at exit"""
+
+    def __init__(self, name, enabled=None):
+        self.name = name
+        self.enabled = PROFILE_ENABLED if enabled is None else enabled
+        self.phases = {}
+        self._lock = threading.Lock()
+        if self.enabled:
+            atexit.register(self.finish)
+
+    @contextmanager
+    def phase(self, phase_name):
+        if not self.enabled:
+            yield
+            return
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        with self._lock:
+            stats = self.phases.setdefault(phase_name, PhaseStats())
+
+        start_snapshot = take_snapshot()
+        try:
+            stats.profile.enable()
+            enabled_now = True
+        except ValueError:
+            # Only one profiler can be active at a time on newer Pythons
+            # (e.g. several scrapers profiling concurrently); keep timing anyway
+            enabled_now = False
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            if enabled_now:
+                stats.profile.disable()
+            diff = take_snapshot().compare_to(start_snapshot, 'lineno')
+            with self._lock:
+                stats.wall += elapsed
+                stats.calls += 1
+                stats.profiled = stats.profiled or enabled_now
+                for stat in diff:
+                    totals = stats.allocations.setdefault(stat.traceback, [0, 0])
+                    totals[0] += stat.size_diff
+                    totals[1] += stat.count_diff
+
+    def output_dir(self):
+        return os.path.join(PROFILE_DIR, RUN_STAMP, self.name.replace(" ", "_"))
+
+    def finish(self):
+        """Write dumps for every phase and print the hot-function summary to stderr"""
+        if not self.enabled or not self.phases:
+            return
+        out_dir = self.output_dir()
+        os.makedirs(out_dir, exist_ok=True)
+        lines = [f"[profile] {self.name}: dumps in {out_dir}"]
+
+        for phase_name, stats in self.phases.items():
+            lines.append(f"[profile] {self.name}/{phase_name}: {stats.wall:.2f}s wall over {stats.calls} call(s)")
+            if stats.profiled:
+                stats.profile.dump_stats(os.path.join(out_dir, f"{phase_name}.pstats"))
+                lines.extend(f"    {entry}" for entry in hot_functions(stats.profile))
+            top = top_allocations(stats.allocations)
+            with open(os.path.join(out_dir, f"{phase_name}.alloc.txt"), 'w') as f:
+                f.write("\n".join(top) + "\n")
+            if top:
+                lines.append(f"    top allocator: {top[0]}")
+
+        print("\n".join(lines), file=sys.stderr, flush=True)
+        self.phases = {}
+
+
+def take_snapshot():
+    """Current tracemalloc snapshot, minus tracemalloc's and this profiler's own bookkeeping"""
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ))
+
+
+def top_allocations(allocations, limit=TOP_ALLOCATIONS):
+    """Lines that allocated the most during a phase (net growth only), formatted one per line"""
+    rows = sorted(((traceback, size, count) for traceback, (size, count) in allocations.items() if size > 0),
+                  key=lambda row: row[1], reverse=True)[:limit]
+    return [f"{traceback}: +{size / 1024:.1f} KiB, {count:+d} blocks" for traceback, size, count in rows]
+
+
+def hot_functions(profile, limit=TOP_FUNCTIONS):
+    """Top functions by self time, formatted one per line"""
+    stats = pstats.Stats(profile)
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:limit]
+    entries = []
+    for (filename, line, func), (_, ncalls, tottime, cumtime, _) in rows:
+        entries.append(f"{tottime:8.3f}s self {cumtime:8.3f}s cum {ncalls:>8} calls  "
+                       f"{func} ({os.path.basename(filename)}:{line})")
+    return entries
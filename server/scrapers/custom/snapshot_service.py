@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Local snapshot query service for scraped bookmaker data
+
+Holds the latest snapshot of every bookmaker (data/<code>.json) in memory with
+indexes by country, tournament, kickoff date and fixture, and answers filtered,
+paginated queries over localhost HTTP without re-parsing the JSON files.
+
+Each bookmaker's snapshot is reloaded on its own as soon as its file changes
+(polled by mtime), or immediately via POST /reload?bookmaker=<code>.
+
+Endpoints:
+    GET  /events?country=&tournament=&bookmaker=&fixture=&date=&from=&to=&page=&page_size=
+         (country/tournament/bookmaker accept comma-separated lists,
+          from/to are "YYYY-MM-DD HH:MM" kickoff bounds, date is "YYYY-MM-DD")
+    GET  /health
+    POST /reload[?bookmaker=<code>]
+
+Run with:
+    python3 server/scrapers/custom/snapshot_service.py
+"""
+import glob
+import json
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from scraper_log import log
+
+# Configuration
+DATA_DIR = os.environ.get("SNAPSHOT_DATA_DIR", "data")
+HOST = os.environ.get("SNAPSHOT_HOST", "127.0.0.1")
+PORT = int(os.environ.get("SNAPSHOT_PORT", "5055"))
+POLL_INTERVAL = 1.0  # Seconds between mtime checks on the snapshot files
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+EXCLUDED_SNAPSHOTS = {"sporty_py"}  # Diagnostic copy of sporty.json
+
+
+def normalize_record(bookmaker, item):
+    """Flatten both snapshot shapes (raw scraper output and mapped Node output)
+
+    Raw:    {eventId, country, tournament, event, start_time, home_odds, ...}
+    Mapped: {id, eventId, teams, league, country, date, time, odds: {home, ...}, raw}
+    """
+    odds = item.get('odds') or {}
+    start_time = item.get('start_time')
+    if not start_time and item.get('date'):
+        start_time = f"{item.get('date')} {item.get('time') or ''}".strip()
+    raw = item.get('raw') or {}
+    return {
+        'bookmaker': bookmaker,
+        'eventId': str(item.get('eventId') or item.get('id') or ''),
+        'fixtureId': item.get('fixtureId') or raw.get('fixtureId'),
+        'country': item.get('country') or '',
+        'tournament': item.get('tournament') or item.get('league') or '',
+        'event': item.get('event') or item.get('teams') or '',
+        'start_time': start_time or '',
+        'home_odds': odds.get('home', item.get('home_odds')),
+        'draw_odds': odds.get('draw', item.get('draw_odds')),
+        'away_odds': odds.get('away', item.get('away_odds')),
+    }
+
+
+class Snapshot:
+    """One bookmaker's events plus lookup indexes; immutable once built"""
+
+    def __init__(self, bookmaker, items, mtime):
+        self.bookmaker = bookmaker
+        self.mtime = mtime
+        self.loaded_at = time.time()
+        self.records = [normalize_record(bookmaker, item) for item in items if isinstance(item, dict)]
+        self.by_country = {}
+        self.by_tournament = {}
+        self.by_date = {}
+        self.by_fixture = {}
+        for idx, record in enumerate(self.records):
+            self.by_country.setdefault(record['country'].lower(), set()).add(idx)
+            self.by_tournament.setdefault(record['tournament'].lower(), set()).add(idx)
+            self.by_date.setdefault(record['start_time'][:10], set()).add(idx)
+            for key in (record['fixtureId'], record['eventId']):
+                if key:
+                    self.by_fixture.setdefault(str(key), set()).add(idx)
+        # Kickoff-sorted positions for time-window queries
+        self.kickoff_order = sorted(range(len(self.records)), key=lambda i: self.records[i]['start_time'])
+        self.kickoffs = [self.records[i]['start_time'] for i in self.kickoff_order]
+
+    def window(self, start=None, end=None):
+        """Indexes of events with start <= kickoff <= end (string compare on "YYYY-MM-DD HH:MM")"""
+        lo = bisect_left(self.kickoffs, start) if start else 0
+        hi = bisect_right(self.kickoffs, end) if end else len(self.kickoffs)
+        return set(self.kickoff_order[lo:hi])
+
+    def select(self, countries=None, tournaments=None, fixture=None, date=None, start=None, end=None):
+        """Intersect the relevant indexes; None means "no filter on this field" """
+        candidates = []
+        if countries:
+            candidates.append(set().union(*(self.by_country.get(c.lower(), ()) for c in countries)))
+        if tournaments:
+            candidates.append(set().union(*(self.by_tournament.get(t.lower(), ()) for t in tournaments)))
+        if fixture:
+            candidates.append(self.by_fixture.get(fixture, set()))
+        if date:
+            candidates.append(self.by_date.get(date, set()))
+        if start or end:
+            candidates.append(self.window(start, end))
+        if not candidates:
+            return self.records
+        candidates.sort(key=len)
+        matched = candidates[0].intersection(*candidates[1:])
+        return [self.records[i] for i in sorted(matched)]
+
+
+class SnapshotStore:
+    """Latest Snapshot per bookmaker, swapped atomically on reload"""
+
+    def __init__(self, data_dir=DATA_DIR):
+        self.data_dir = data_dir
+        self.snapshots = {}
+        self._lock = threading.Lock()
+
+    def _paths(self):
+        for path in glob.glob(os.path.join(self.data_dir, "*.json")):
+            bookmaker = os.path.splitext(os.path.basename(path))[0]
+            if bookmaker not in EXCLUDED_SNAPSHOTS:
+                yield bookmaker, path
+
+    def reload(self, bookmaker=None, force=False):
+        """Reload changed snapshots (or just one bookmaker's); returns codes reloaded"""
+        reloaded = []
+        for code, path in self._paths():
+            if bookmaker and code != bookmaker:
+                continue
+            try:
+                mtime = os.path.getmtime(path)
+                current = self.snapshots.get(code)
+                if not force and current and current.mtime == mtime:
+                    continue
+                with open(path) as f:
+                    items = json.load(f)
+                snapshot = Snapshot(code, items if isinstance(items, list) else [], mtime)
+            except (OSError, ValueError) as e:
+                # Usually a file caught mid-write; the old snapshot stays and we retry on the next poll
+                log(f"Could not load snapshot for {code}: {e}", "warning")
+                continue
+            with self._lock:
+                self.snapshots[code] = snapshot
+            reloaded.append(code)
+            log(f"Loaded {len(snapshot.records)} events for {code}")
+        return reloaded
+
+    def watch(self, interval=POLL_INTERVAL):
+        """Poll file mtimes forever, reloading each bookmaker as soon as its scraper writes"""
+        while True:
+            self.reload()
+            time.sleep(interval)
+
+    def query(self, bookmakers=None, page=1, page_size=DEFAULT_PAGE_SIZE, **filters):
+        with self._lock:
+            snapshots = dict(self.snapshots)
+        if bookmakers:
+            snapshots = {code: s for code, s in snapshots.items() if code in bookmakers}
+        matched = []
+        for snapshot in snapshots.values():
+            matched.extend(snapshot.select(**filters))
+        matched.sort(key=lambda r: (r['start_time'], r['bookmaker'], r['eventId']))
+        offset = (page - 1) * page_size
+        return {
+            'total': len(matched),
+            'page': page,
+            'page_size': page_size,
+            'events': matched[offset:offset + page_size],
+        }
+
+    def health(self):
+        with self._lock:
+            return {code: {'events': len(s.records), 'loaded_at': s.loaded_at}
+                    for code, s in sorted(self.snapshots.items())}
+
+
+def make_handler(store):
+    class SnapshotHandler(BaseHTTPRequestHandler):
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            params = parse_qs(url.query)
+
+            def param_list(name):
+                values = [v for raw in params.get(name, []) for v in raw.split(',') if v]
+                return values or None
+
+            def param(name):
+                return params.get(name, [None])[0]
+
+            if url.path == "/health":
+                return self._send(200, store.health())
+            if url.path != "/events":
+                return self._send(404, {'error': f"Unknown path {url.path}"})
+            try:
+                page = max(1, int(param('page') or 1))
+                page_size = min(MAX_PAGE_SIZE, max(1, int(param('page_size') or DEFAULT_PAGE_SIZE)))
+            except ValueError:
+                return self._send(400, {'error': 'page and page_size must be integers'})
+            result = store.query(
+                bookmakers=param_list('bookmaker'),
+                page=page,
+                page_size=page_size,
+                countries=param_list('country'),
+                tournaments=param_list('tournament'),
+                fixture=param('fixture'),
+                date=param('date'),
+                start=param('from'),
+                end=param('to'),
+            )
+            self._send(200, result)
+
+        def do_POST(self):
+            url = urlsplit(self.path)
+            if url.path != "/reload":
+                return self._send(404, {'error': f"Unknown path {url.path}"})
+            bookmaker = parse_qs(url.query).get('bookmaker', [None])[0]
+            self._send(200, {'reloaded': store.reload(bookmaker, force=True)})
+
+        def log_message(self, format, *args):
+            log(f"{self.address_string()} {format % args}", "debug")
+
+    return SnapshotHandler
+
+
+def main():
+    store = SnapshotStore()
+    store.reload()
+    threading.Thread(target=store.watch, daemon=True, name="snapshot-watch").start()
+    server = ThreadingHTTPServer((HOST, PORT), make_handler(store))
+    log(f"Snapshot service listening on http://{HOST}:{PORT} ({len(store.snapshots)} bookmakers loaded)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
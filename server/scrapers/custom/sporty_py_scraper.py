@@ -12,10 +12,14 @@ import json
 import os
 import time
 import re
-import requests
 from datetime import datetime
 import traceback
 
+from scraper_http import HedgedClient, CircuitOpenError, ScrapeError
+from event_crosswalk import open_crosswalk
+from scraper_profile import Profiler
+from scraper_log import log
+
 # Make sure stdout is line buffered for integration with Node.js
 # Different Python versions have different ways to handle this
 try:
@@ -29,56 +33,53 @@ except AttributeError:
 # Configuration
 BASE_URL = "https://www.sportybet.com/api/gh/factsCenter/pcUpcomingEvents"
 OUTPUT_FILE = "data/sporty_py.json"  # Separate output file for testing
-TIMEOUT = 15  # Reduce timeout to 15 seconds
-QUERY = "sportId=sr%3Asport%3A1&marketId=1%2C18%2C10%2C29%2C11%2C26%2C36%2C14%2C60100&pageSize=100"
+TIMEOUT = 15  # Hard per-request timeout; slow pages are hedged well before this
 MAX_PAGES = 20  # Maximum number of pages to fetch (increased to capture more events)
+MAX_RUNTIME = 120  # Global runtime limit in seconds to avoid hanging
+REQUEST_INTERVAL = 0.5  # Minimum seconds between page requests, to be polite to the server
+BOOKMAKER_CODE = "sporty"  # Our code for Sportybet in the event-ID crosswalk
+
+def env_set(name, default=""):
+    """Comma-separated environment variable as a lowercase set"""
+    return {v.strip().lower() for v in os.environ.get(name, default).split(",") if v.strip()}
+
+# Filters and watchlists (all comma-separated, case-insensitive)
+# Only the 1X2 market (id 1) is parsed, so only that market is requested from the API
+MARKET_IDS = os.environ.get("SPORTY_MARKET_IDS", "1")
+QUERY = f"sportId=sr%3Asport%3A1&marketId={MARKET_IDS.replace(',', '%2C')}&pageSize=100"
+# Tournaments whose name contains any of these are dropped (checked once per tournament)
+EXCLUDE_TOURNAMENT_KEYWORDS = sorted(env_set("SPORTY_EXCLUDE_TOURNAMENT_KEYWORDS", "Simulated Reality League"))
+EXCLUDE_TOURNAMENTS = env_set("SPORTY_EXCLUDE_TOURNAMENTS")  # Exact tournament names
+EXCLUDE_COUNTRIES = env_set("SPORTY_EXCLUDE_COUNTRIES")  # Category names, e.g. "Simulated Reality League"
+EXCLUDE_CATEGORIES = env_set("SPORTY_EXCLUDE_CATEGORIES")  # Category ids, e.g. "sr:category:1"
+# Event ids (numeric part of sr:match:<n>) we expect to see every run
+WATCH_EVENT_IDS = env_set("SPORTY_WATCH_EVENT_IDS", "50850679,50850810,50850826,50850822")
+# "Country/Tournament" pairs we log per-run diagnostics for
+WATCH_TOURNAMENTS = env_set("SPORTY_WATCH_TOURNAMENTS", "England/Premier League")
+
+# Per-phase cProfile/tracemalloc dumps when run with --profile or SCRAPER_PROFILE=true
+PROFILER = Profiler(BOOKMAKER_CODE)
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0",
     "Accept": "application/json"
 }
 
-def log(message, level="info"):
-    """Log messages with timestamp
+def fetch_page(page, client):
+    """Fetch a single page from Sportybet API
     
-    Levels:
-    - critical: Always log
-    - error: Always log errors
-    - warning: Log warnings only when LOG_LEVEL is warning or lower
-    - info: Only log when LOG_LEVEL is info or lower
-    - debug: Only log when LOG_LEVEL is debug
+    The caller owns the HedgedClient so its breakers, latency stats and
+    connection pool are shared across pages and saved when it is closed.
+    Raises CircuitOpenError if Sportybet is currently marked as down,
+    so the caller can stop paginating instead of waiting on every page.
     """
-    # Get log level from environment variable, default to info
-    env_log_level = os.environ.get("LOG_LEVEL", "info").lower()
-    
-    # Define log level priorities (lower number = higher priority)
-    log_levels = {
-        "critical": 0,
-        "error": 1,
-        "warning": 2,
-        "info": 3,
-        "debug": 4
-    }
-    
-    # Default to info if level is not recognized
-    current_level_priority = log_levels.get(level.lower(), 3)
-    env_level_priority = log_levels.get(env_log_level, 3)
-    
-    # Only log if the message level is higher priority (lower number) than or equal to the env setting
-    if current_level_priority <= env_level_priority:
-        timestamp = datetime.now().strftime('%Y-%m-%dT%H:%M:%S.%fZ')
-        # Write logs to stderr instead of stdout to keep stdout clean for JSON output
-        print(f"[{timestamp}] [{level.upper()}] {message}", file=sys.stderr, flush=True)
-
-def fetch_page(page=1):
-    """Fetch a single page from Sportybet API"""
     try:
         # Add timestamp to avoid caching
         timestamp = int(datetime.now().timestamp() * 1000)
         url = f"{BASE_URL}?{QUERY}&pageNum={page}&_t={timestamp}"
         
         log(f"Fetching URL: {url}", "debug")
-        response = requests.get(url, headers=HEADERS, timeout=TIMEOUT)
+        response = client.get(url, min_interval=REQUEST_INTERVAL, headers=HEADERS)
         
         if response.status_code != 200:
             log(f"Error fetching {url}: Status code {response.status_code}", "error")
@@ -97,10 +98,53 @@ def fetch_page(page=1):
             # Print first 100 characters of response
             log(f"Response starts with: {response.text[:100]}...", "debug")
             return None
+    except CircuitOpenError:
+        raise
     except Exception as e:
         log(f"Error fetching page {page}: {str(e)}", "error")
         return None
 
+def tournament_category(tournament):
+    """(country name, category id) of a tournament, taken from its first event"""
+    events = tournament.get('events') if isinstance(tournament, dict) else None
+    if events and isinstance(events, list) and isinstance(events[0], dict):
+        category = (events[0].get('sport') or {}).get('category') or {}
+        return category.get('name') or 'Unknown', category.get('id') or ''
+    return "Unknown", ''
+
+def exclusion_reason(tournament):
+    """Why a raw tournament should be dropped before its events are touched, or None"""
+    name = (tournament.get('name') or '').lower()
+    country, category_id = tournament_category(tournament)
+    if name in EXCLUDE_TOURNAMENTS:
+        return "tournament"
+    if country.lower() in EXCLUDE_COUNTRIES:
+        return "country"
+    if category_id and str(category_id).lower() in EXCLUDE_CATEGORIES:
+        return "category"
+    if any(keyword in name for keyword in EXCLUDE_TOURNAMENT_KEYWORDS):
+        return "keyword"
+    return None
+
+def filter_tournaments(tournaments, excluded_counts):
+    """Drop excluded tournaments, tallying reasons into excluded_counts
+    
+    A tournament that can't be checked is kept, so process_tournaments() can
+    skip it on its own instead of taking the rest of the page down with it.
+    """
+    kept = []
+    for tournament in tournaments:
+        try:
+            reason = exclusion_reason(tournament)
+        except Exception as e:
+            log(f"Could not check tournament for exclusion: {str(e)}", "debug")
+            reason = None
+        if reason:
+            excluded_counts[reason] = excluded_counts.get(reason, 0) + 1
+        else:
+            kept.append(tournament)
+    return kept
+
 def process_event(event, endpoint_idx=0):
     """Process a single event from Sportybet API response"""
     try:
@@ -192,50 +236,48 @@ def process_event(event, endpoint_idx=0):
         log(traceback.format_exc(), "debug")
         return None
 
-def process_tournaments(tournaments):
-    """Process the raw tournament data into our standardized format"""
+def process_tournaments(tournaments, crosswalk=None):
+    """Process the raw tournament data into our standardized format
+    
+    If a crosswalk is given, each event is stamped with its canonical fixtureId.
+    """
     processed_events = []
     event_count = 0
     skipped_count = 0
     
-    # Special event IDs to track (for Premier League)
-    SPECIAL_EVENT_IDS = ['50850679', '50850810', '50850826', '50850822']
-    special_events_found = {}
+    # Watched event ids seen this run
+    watched_events_found = set()
     
     # Track progress
     log(f"Processing {len(tournaments)} tournaments...")
     
-    # Track England Premier League events specifically
-    epl_events = {
-        'found': 0,
-        'with_odds': 0,
-        'dates': set(),
-        'teams': []
-    }
+    # Aggregated diagnostics per watched tournament (counters only, no per-event data)
+    watched_stats = {}
+    
+    # Excluded tournaments are normally dropped at fetch time already; this catches direct callers
+    excluded_counts = {}
     
     for tournament in tournaments:
         try:
-            # Extract country and tournament name
-            country = "Unknown"
-            tournament_name = tournament.get('name', 'Unknown Tournament')
-            
-            # Skip Simulated Reality League explicitly
-            if "Simulated Reality League" in tournament_name:
-                log(f"Skipping 'Simulated Reality League' tournament: {tournament_name}")
+            reason = exclusion_reason(tournament)
+            if reason:
+                excluded_counts[reason] = excluded_counts.get(reason, 0) + 1
                 continue
-                
-            # Check if this is EPL
-            if 'events' in tournament and len(tournament['events']) > 0:
-                first_event = tournament['events'][0]
-                if 'sport' in first_event and 'category' in first_event['sport']:
-                    country = first_event['sport']['category'].get('name', 'Unknown')
             
-            is_epl = (country == 'England' and 
-                     (tournament_name.find('Premier League') >= 0 or 
-                      tournament_name.find('Premier league') >= 0))
+            # Extract country and tournament name
+            tournament_name = tournament.get('name') or 'Unknown Tournament'
+            country, _ = tournament_category(tournament)
             
-            if is_epl:
-                log(f"🏴󠁧󠁢󠁥󠁮󠁧󠁿 Found England Premier League tournament: {tournament_name}")
+            watch_key = f"{country}/{tournament_name}".lower()
+            stats = None
+            if watch_key in WATCH_TOURNAMENTS:
+                stats = watched_stats.setdefault(watch_key, {
+                    'label': f"{country}/{tournament_name}",
+                    'with_odds': 0,
+                    'no_market': 0,
+                    'zero_odds': 0,
+                    'dates': set()
+                })
             
             if 'events' not in tournament or not isinstance(tournament['events'], list):
                 continue
@@ -252,10 +294,8 @@ def process_tournaments(tournaments):
                     market = next((m for m in event.get('markets', []) if m.get('id') == "1"), None)
                     if not market or not market.get('outcomes') or not isinstance(market.get('outcomes'), list):
                         skipped_count += 1
-                        
-                        # Track EPL events without odds
-                        if is_epl:
-                            log(f"❌ EPL event without markets: {event.get('homeTeamName')} vs {event.get('awayTeamName')} (ID: {event.get('eventId')})")
+                        if stats is not None:
+                            stats['no_market'] += 1
                         continue
                     
                     # Extract odds from the outcomes
@@ -269,17 +309,17 @@ def process_tournaments(tournaments):
                     # Skip events with missing odds
                     if home_odds == 0 and draw_odds == 0 and away_odds == 0:
                         skipped_count += 1
-                        
-                        # Track EPL events without odds
-                        if is_epl:
-                            log(f"❌ EPL event with zero odds: {event.get('homeTeamName')} vs {event.get('awayTeamName')} (ID: {event.get('eventId')})")
+                        if stats is not None:
+                            stats['zero_odds'] += 1
                         continue
                     
                     # Format the start time
                     start_time = None
+                    kickoff = None  # UTC epoch seconds, for the crosswalk
                     if event.get('estimateStartTime'):
                         try:
-                            date_obj = datetime.fromtimestamp(int(event.get('estimateStartTime')) / 1000)
+                            kickoff = int(event.get('estimateStartTime')) / 1000
+                            date_obj = datetime.fromtimestamp(kickoff)
                             start_time = date_obj.strftime('%Y-%m-%d %H:%M')
                         except:
                             pass
@@ -288,28 +328,17 @@ def process_tournaments(tournaments):
                     original_id = event.get('eventId', '')
                     normalized_id = re.sub(r'\D', '', original_id) if original_id else ''
                     
-                    # Check if this is one of our special tracked events (just track if found)
-                    if any(normalized_id == id or original_id.find(id) >= 0 for id in SPECIAL_EVENT_IDS):
-                        matched_id = next((id for id in SPECIAL_EVENT_IDS if normalized_id == id or original_id.find(id) >= 0), None)
-                        if matched_id:
-                            special_events_found[matched_id] = True
+                    # Watched event ids are a set, so this is a single hash lookup
+                    if normalized_id in WATCH_EVENT_IDS:
+                        watched_events_found.add(normalized_id)
                     
-                    # Track EPL events
-                    if is_epl:
-                        epl_events['found'] += 1
-                        epl_events['with_odds'] += 1
+                    if stats is not None:
+                        stats['with_odds'] += 1
                         if start_time:
-                            epl_events['dates'].add(start_time.split(' ')[0])  # Just the date part
-                        epl_events['teams'].append({
-                            'teams': f"{event.get('homeTeamName')} - {event.get('awayTeamName')}",
-                            'date': start_time,
-                            'eventId': original_id,
-                            'normalizedId': normalized_id,
-                            'odds': {'home': home_odds, 'draw': draw_odds, 'away': away_odds}
-                        })
+                            stats['dates'].add(start_time.split(' ')[0])  # Just the date part
                     
                     # Add the processed event to our collection
-                    processed_events.append({
+                    processed_event = {
                         'eventId': normalized_id,
                         'originalEventId': original_id,
                         'country': country,
@@ -320,7 +349,14 @@ def process_tournaments(tournaments):
                         'draw_odds': draw_odds,
                         'away_odds': away_odds,
                         'start_time': start_time
-                    })
+                    }
+                    
+                    # Sportybet ids are Sportradar match ids, so they link directly
+                    if crosswalk is not None:
+                        crosswalk.stamp(processed_event, BOOKMAKER_CODE, normalized_id,
+                                        sportradar_id=normalized_id, kickoff=kickoff)
+                    
+                    processed_events.append(processed_event)
                     
                     event_count += 1
                 except Exception as e:
@@ -331,101 +367,147 @@ def process_tournaments(tournaments):
             log(f"Error processing tournament: {str(e)}", "error")
             continue
     
-    # Log compact EPL stats
-    if epl_events['found'] > 0:
-        log(f"🏴󠁧󠁢󠁥󠁮󠁧󠁿 PREMIER LEAGUE: {epl_events['found']} events with valid odds")
-        log(f"Dates covered: {', '.join(sorted(epl_events['dates']))}")
+    if excluded_counts:
+        log(f"Excluded tournaments: {excluded_counts}")
     
-    # Report on missing special events in a single log line
-    missing_ids = [id for id in SPECIAL_EVENT_IDS if id not in special_events_found]
+    # Log compact stats for each watched tournament
+    for stats in watched_stats.values():
+        log(f"👀 {stats['label']}: {stats['with_odds']} events with valid odds "
+            f"({stats['no_market']} without 1X2 market, {stats['zero_odds']} with zero odds)")
+        log(f"Dates covered: {', '.join(sorted(stats['dates']))}")
+    
+    # Report on missing watched events in a single log line
+    missing_ids = sorted(WATCH_EVENT_IDS - watched_events_found)
     if missing_ids:
-        log(f"⚠️ Missing special EPL events: {', '.join(missing_ids)}")
+        log(f"⚠️ Missing watched events: {', '.join(missing_ids)}")
     
     log(f"✅ Successfully processed {event_count} events (skipped {skipped_count})")
     return processed_events
 
-def main():
-    """Main entry point for the scraper"""
-    try:
-        # Global runtime limit to avoid hanging
-        start_time = time.time()
-        max_runtime = 120  # seconds
-        
-        # Log the startup
-        log("Starting Sportybet data collection (Python scraper)")
-        
-        all_tournaments = []
-        total_events = 0
-        
-        # Get total pages to process
-        page = 1
-        more_pages = True
-        log(f"📚 Will attempt to fetch up to {MAX_PAGES} pages of data")
+def scrape(client=None, crosswalk=None, deadline=None, cancel=None):
+    """Fetch and parse every page of upcoming Sportybet events
+    
+    A caller running several bookmakers at once can pass in a shared client,
+    crosswalk and deadline (epoch seconds); otherwise they are created here.
+    cancel is an optional threading.Event that stops pagination when set.
+    Raises ScrapeError if no page could be fetched because of errors.
+    """
+    # Global runtime limit to avoid hanging
+    start_time = time.time()
+    if deadline is None:
+        deadline = start_time + MAX_RUNTIME
+    max_runtime = deadline - start_time
+    
+    # Log the startup
+    log("Starting Sportybet data collection (Python scraper)")
+    
+    all_tournaments = []
+    total_events = 0
+    excluded_counts = {}
+    pages_ok = 0
+    last_error = None
+    own_client = client is None
+    if own_client:
+        client = HedgedClient(timeout=TIMEOUT)
+    
+    # Get total pages to process
+    page = 1
+    more_pages = True
+    log(f"📚 Will attempt to fetch up to {MAX_PAGES} pages of data")
+    
+    while more_pages and page <= MAX_PAGES:
+        if time.time() > deadline:
+            log(f"⚠️ Reached maximum runtime limit of {max_runtime:.0f} seconds, stopping after {page-1} pages.")
+            break
+        if cancel is not None and cancel.is_set():
+            log(f"⚠️ Cancelled, stopping after {page-1} pages.", "warning")
+            break
         
-        while more_pages and page <= MAX_PAGES:
-            if time.time() - start_time > max_runtime:
-                log(f"⚠️ Reached maximum runtime limit of {max_runtime} seconds, stopping after {page-1} pages.")
-                break
+        try:
+            # Get data for this page
+            with PROFILER.phase("fetch"):
+                page_data = fetch_page(page, client)
             
-            try:
-                # Get data for this page
-                page_data = fetch_page(page)
-                
-                if not page_data or 'data' not in page_data or 'tournaments' not in page_data['data']:
-                    log(f"❌ Invalid data format from page {page} - no tournaments found")
-                    # Try one more page before giving up
-                    if page > 1:
-                        more_pages = False
-                    page += 1
-                    continue
-                
-                # Process the tournaments
-                tournaments = page_data['data'].get('tournaments', [])
-                log(f"📊 Found {len(tournaments)} tournaments on page {page}")
-                
-                # Check if we have events on this page
-                page_events = sum(len(t.get('events', [])) for t in tournaments)
-                total_events += page_events
-                log(f"📊 Found {page_events} events on page {page} (total: {total_events})")
-                
-                # If page has no events or tournaments, we've likely reached the end
-                if page_events == 0 or len(tournaments) == 0:
-                    log(f"📊 No more events found after page {page}, stopping pagination")
+            if not page_data or 'data' not in page_data or 'tournaments' not in page_data['data']:
+                log(f"❌ Invalid data format from page {page} - no tournaments found")
+                last_error = last_error or f"No valid data from page {page}"
+                # Try one more page before giving up
+                if page > 1:
                     more_pages = False
-                else:
-                    # Store tournaments for processing
-                    all_tournaments.extend(tournaments)
-                
-                # Short pause between requests to be polite to the server
-                time.sleep(0.5)
-                
-                # Move to next page
                 page += 1
-            except Exception as e:
-                log(f"❌ Error processing page {page}: {str(e)}", "error")
-                log(traceback.format_exc(), "debug")
-                # Try to continue with next page
-                page += 1
-        
-        # Process all tournaments with time monitoring
-        elapsed_seconds = (time.time() - start_time)
-        log(f"Processing tournaments after {elapsed_seconds:.1f}s/{max_runtime}s...")
-        
-        # Check if we have enough time left for processing
-        if elapsed_seconds > max_runtime * 0.7:  # If we've used 70% of our time already
-            log(f"⚠️ Limited time remaining, processing only a subset of collected tournaments")
-            # Take only a subset if we have too many to process
-            if len(all_tournaments) > 20:
-                log(f"Limiting from {len(all_tournaments)} to 20 tournaments for faster processing")
-                # Prioritize England tournaments first to ensure Premier League events
-                england_tournaments = [t for t in all_tournaments if 'events' in t and len(t['events']) > 0 
-                                      and 'sport' in t['events'][0] and 'category' in t['events'][0]['sport'] 
-                                      and t['events'][0]['sport']['category'].get('name', '') == 'England']
-                other_tournaments = [t for t in all_tournaments if t not in england_tournaments]
-                all_tournaments = england_tournaments + other_tournaments[:max(0, 20 - len(england_tournaments))]
-        
-        all_events = process_tournaments(all_tournaments)
-        log(f"Total: collected {len(all_events)} events")
+                continue
+            
+            # Process the tournaments
+            pages_ok += 1
+            tournaments = page_data['data'].get('tournaments', [])
+            log(f"📊 Found {len(tournaments)} tournaments on page {page}")
+            
+            # Check if we have events on this page
+            page_events = sum(len(t.get('events') or []) for t in tournaments if isinstance(t, dict))
+            total_events += page_events
+            log(f"📊 Found {page_events} events on page {page} (total: {total_events})")
+            
+            # If page has no events or tournaments, we've likely reached the end
+            if page_events == 0 or len(tournaments) == 0:
+                log(f"📊 No more events found after page {page}, stopping pagination")
+                more_pages = False
+            else:
+                # Drop excluded tournaments straight away so they are never stored or parsed
+                all_tournaments.extend(filter_tournaments(tournaments, excluded_counts))
+            
+            # Move to next page
+            page += 1
+        except CircuitOpenError as e:
+            log(f"⚡ {str(e)} - Sportybet looks down, skipping remaining pages", "warning")
+            last_error = str(e)
+            break
+        except Exception as e:
+            log(f"❌ Error processing page {page}: {str(e)}", "error")
+            last_error = f"Error processing page {page}: {str(e)}"
+            log(traceback.format_exc(), "debug")
+            # Try to continue with next page
+            page += 1
+    
+    # A shared client is summarized and closed by whoever owns it
+    if own_client:
+        log(client.format_summary())
+        client.close()
+    if excluded_counts:
+        log(f"Excluded tournaments at fetch time: {excluded_counts}")
+    if not pages_ok and last_error:
+        raise ScrapeError(last_error)
+    
+    # Process all tournaments with time monitoring
+    elapsed_seconds = (time.time() - start_time)
+    log(f"Processing tournaments after {elapsed_seconds:.1f}s/{max_runtime:.0f}s...")
+    
+    # Check if we have enough time left for processing
+    if elapsed_seconds > max_runtime * 0.7:  # If we've used 70% of our time already
+        log(f"⚠️ Limited time remaining, processing only a subset of collected tournaments")
+        # Take only a subset if we have too many to process
+        if len(all_tournaments) > 20:
+            log(f"Limiting from {len(all_tournaments)} to 20 tournaments for faster processing")
+            # Prioritize England tournaments first to ensure Premier League events
+            england_tournaments = [t for t in all_tournaments if tournament_category(t)[0] == 'England']
+            other_tournaments = [t for t in all_tournaments if t not in england_tournaments]
+            all_tournaments = england_tournaments + other_tournaments[:max(0, 20 - len(england_tournaments))]
+    
+    with PROFILER.phase("parse"):
+        own_crosswalk = crosswalk is None
+        if own_crosswalk:
+            # None if the crosswalk file can't be opened; events are then returned without fixture ids
+            crosswalk = open_crosswalk()
+        all_events = process_tournaments(all_tournaments, crosswalk)
+        if own_crosswalk and crosswalk is not None:
+            log(crosswalk.summary())
+            crosswalk.close()
+    log(f"Total: collected {len(all_events)} events")
+    return all_events
+
+def main():
+    """Main entry point for the scraper"""
+    try:
+        all_events = scrape()
         
         # Save all events to file
         if all_events:
@@ -446,8 +528,12 @@ def main():
                     premier_league_count += 1
             
             # 2. Save to our test file - clear and detailed output for diagnostics
-            with open(OUTPUT_FILE, 'w') as f:
-                json.dump(all_events, f, indent=2)
+            # Serialized once; the standard output file below gets the same content
+            with PROFILER.phase("serialize"):
+                pretty_json = json.dumps(all_events, indent=2)
+            with PROFILER.phase("write"):
+                with open(OUTPUT_FILE, 'w') as f:
+                    f.write(pretty_json)
             
             log(f"Saved {len(all_events)} events to test file {OUTPUT_FILE}")
             
@@ -464,8 +550,9 @@ def main():
             
             # 4. Save to the standard output file for integration
             standard_output = "data/sporty.json"
-            with open(standard_output, 'w') as f:
-                json.dump(all_events, f, indent=2)
+            with PROFILER.phase("write"):
+                with open(standard_output, 'w') as f:
+                    f.write(pretty_json)
             
             log(f"Saved {len(all_events)} events to standard file {standard_output}")
             
@@ -475,12 +562,14 @@ def main():
             
             # Prepare the JSON output in memory first to catch any serialization errors
             try:
-                output_json = json.dumps(all_events)
+                with PROFILER.phase("serialize"):
+                    output_json = json.dumps(all_events)
                 
                 # Important: Print ONLY the JSON output to stdout for the Node.js integration to capture
                 # All logs should be written to stderr, keeping stdout clean for JSON output
-                print(output_json)  # This goes to stdout
-                sys.stdout.flush()  # Force flush to ensure Node.js receives the data
+                with PROFILER.phase("write"):
+                    print(output_json)  # This goes to stdout
+                    sys.stdout.flush()  # Force flush to ensure Node.js receives the data
             except Exception as e:
                 log(f"Error serializing to stdout: {str(e)}", "error")
                 # Return empty JSON array to stdout on error
@@ -496,6 +585,13 @@ def main():
             sys.stdout.flush()  # Force flush
         
         return 0
+    except ScrapeError as e:
+        log(f"❌ Sportybet scrape failed: {str(e)}", "error")
+        # Return empty array to stdout, same as when nothing was collected
+        print("[]")  # This goes to stdout
+        sys.stdout.flush()  # Force flush
+        
+        return 1
     except Exception as e:
         log(f"❌ Error in main function: {str(e)}", "critical")
         log(traceback.format_exc(), "error")